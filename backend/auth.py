@@ -1,18 +1,47 @@
+import asyncio
+import base64
+import calendar
+import hashlib
+import hmac
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
+import bcrypt
+import jwt
+import orjson
+from cachetools import TTLCache
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db, User
 from config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Argon2 is preferred (much faster verify at an equal security margin);
+# bcrypt stays enabled so existing hashes keep working and get upgraded
+# transparently on next login. Rounds/costs follow OWASP recommendations.
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=10,
+    argon2__time_cost=2,
+    argon2__memory_cost=19456,
+    argon2__parallelism=1,
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 MAX_BCRYPT_BYTES = 72
 
+# Encode the signing key once rather than per encode/decode call
+_SIGNING_KEY = settings.SECRET_KEY.encode("utf-8")
+
+# The JWT header never changes for HS256 tokens, so its base64url form is
+# computed once instead of being re-serialized inside every encode call
+_HEADER_B64 = base64.urlsafe_b64encode(b'{"alg":"HS256","typ":"JWT"}').rstrip(b"=")
+
 
 def _truncate_for_bcrypt(password: str) -> str:
     """
@@ -27,11 +56,76 @@ def _truncate_for_bcrypt(password: str) -> str:
     return password[:MAX_BCRYPT_BYTES]
 
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(_truncate_for_bcrypt(plain_password), hashed_password)
+# Dedicated pool for password hashing. The shared anyio pool has 40
+# threads, which is right for I/O but causes CPU thrash if that many
+# hashes run at once; capping near the core count keeps throughput at
+# roughly cores / hash_time without starving the I/O pool.
+_hash_pool = ThreadPoolExecutor(
+    max_workers=min(os.cpu_count() or 4, 8), thread_name_prefix="pwdhash"
+)
+
+
+def _verify_and_update(plain: str, hashed: str):
+    # Legacy bcrypt hashes take the direct-bindings fast path: checkpw
+    # skips passlib's scheme registry walk and handler construction.
+    # Successful bcrypt logins still get an argon2 upgrade hash.
+    if hashed.startswith(("$2a$", "$2b$", "$2y$")):
+        if not bcrypt.checkpw(plain.encode(), hashed.encode()):
+            return False, None
+        return True, pwd_context.hash(plain)
+    return pwd_context.verify_and_update(plain, hashed)
+
+
+async def verify_password(plain_password, hashed_password):
+    """
+    Verify a password, returning (valid, new_hash). new_hash is set when
+    the stored hash uses a deprecated scheme/cost and should be persisted.
+    """
+    # Hashing is intentionally slow (~100ms+); run it on a worker thread so
+    # concurrent logins don't serialize on the event loop.
+    return await asyncio.get_running_loop().run_in_executor(
+        _hash_pool, _verify_and_update, _truncate_for_bcrypt(plain_password), hashed_password
+    )
+
+async def get_password_hash(password):
+    return await asyncio.get_running_loop().run_in_executor(
+        _hash_pool, pwd_context.hash, _truncate_for_bcrypt(password)
+    )
+
+# Decoded JWT payloads cached by token hash. The same bearer token is sent
+# on every request for its whole lifetime, so re-verifying the HMAC signature
+# each time is pure repeated work. Entries also expire with the token itself.
+_jwt_cache = TTLCache(maxsize=10000, ttl=30)
+
+
+# Authenticated user rows cached briefly by id. User rows never change
+# after signup in this app, so skipping the SELECT per request is safe; the
+# short TTL keeps any future profile edits from going stale for long.
+_user_cache = TTLCache(maxsize=5000, ttl=60)
+
+# Lightweight stand-in for a User row so we never hand out a detached ORM
+# object bound to a closed session. Handlers only read id/email/username.
+CachedUser = namedtuple("CachedUser", ["id", "email", "username"])
+
+
+def _decode_cached(token: str) -> dict:
+    """Decode a JWT, reusing a recently verified payload when possible."""
+    key = hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+    cached = _jwt_cache.get(key)
+    if cached is not None:
+        payload, exp_ts = cached
+        if exp_ts is None or time.time() <= exp_ts:
+            return payload
+        del _jwt_cache[key]
+    payload = jwt.decode(
+        token,
+        _SIGNING_KEY,
+        algorithms=[settings.ALGORITHM],
+        options={"require": ["exp", "sub"]},
+    )
+    _jwt_cache[key] = (payload, payload.get("exp"))
+    return payload
 
-def get_password_hash(password):
-    return pwd_context.hash(_truncate_for_bcrypt(password))
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -39,25 +133,37 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
+    to_encode.update({"exp": calendar.timegm(expire.utctimetuple())})
+    # Assemble the HS256 token directly: cached header + orjson payload +
+    # one HMAC, skipping PyJWT's per-call header serialization and checks.
+    # Decoding stays on jwt.decode, which verifies the same format.
+    payload_b64 = base64.urlsafe_b64encode(orjson.dumps(to_encode)).rstrip(b"=")
+    signing_input = _HEADER_B64 + b"." + payload_b64
+    signature = hmac.new(_SIGNING_KEY, signing_input, hashlib.sha256).digest()
+    signature_b64 = base64.urlsafe_b64encode(signature).rstrip(b"=")
+    return (signing_input + b"." + signature_b64).decode()
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-    except JWTError:
+        payload = _decode_cached(token)
+        # sub is the user id, carried as a string per RFC 7519
+        user_id = int(payload.get("sub"))
+    except (jwt.PyJWTError, TypeError, ValueError):
         raise credentials_exception
-    
-    user = db.query(User).filter(User.email == email).first()
+
+    cached = _user_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    # Primary-key lookup: consults the identity map before issuing SQL
+    user = await db.get(User, user_id)
     if user is None:
         raise credentials_exception
-    return user
\ No newline at end of file
+    cached = CachedUser(id=user.id, email=user.email, username=user.username)
+    _user_cache[user_id] = cached
+    return cached
\ No newline at end of file
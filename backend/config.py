@@ -9,5 +9,8 @@ class Settings:
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-this-to-something-secure")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Below this ATS score, Gemini calls are skipped in favor of canned
+    # basics; set to 0 to always call Gemini (e.g. in dev)
+    MIN_SCORE_FOR_GEMINI: int = int(os.getenv("MIN_SCORE_FOR_GEMINI", "10"))
 
 settings = Settings()
\ No newline at end of file
@@ -1,64 +1,118 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text
+import asyncio
+from sqlalchemy import event, Column, Index, Integer, String, DateTime, Text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from datetime import datetime
 from config import settings
 
-# Create engine with proper configuration
-engine = create_engine(
-    settings.DATABASE_URL, 
-    connect_args={"check_same_thread": False},
+# Normalize plain sqlite URLs onto the aiosqlite async driver so existing
+# .env values keep working unchanged
+_db_url = settings.DATABASE_URL
+if _db_url.startswith("sqlite:///"):
+    _db_url = _db_url.replace("sqlite:///", "sqlite+aiosqlite:///", 1)
+
+# Create engine with proper configuration. The async engine keeps DB work
+# off the event loop, so handlers no longer serialize on queries/commits.
+engine = create_async_engine(
+    _db_url,
+    poolclass=AsyncAdaptedQueuePool,  # Reuse connections instead of open/close per request
+    pool_size=10,
+    max_overflow=20,
     echo=False  # Set to True for SQL debugging
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@event.listens_for(engine.sync_engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Tune SQLite for concurrent web traffic: WAL lets readers proceed
+    while a writer commits, and synchronous=NORMAL drops the per-commit
+    fsync that the default rollback journal pays.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-65536")  # 64 MB page cache
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256 MB mmap window
+    cursor.close()
+
+
+SessionLocal = async_sessionmaker(
+    engine, class_=AsyncSession, expire_on_commit=False, autoflush=False
+)
 Base = declarative_base()
 
 class User(Base):
     __tablename__ = "users"
-    
+
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
     username = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
-    
+
     def __repr__(self):
         return f"<User(id={self.id}, email='{self.email}', username='{self.username}')>"
 
 class Analysis(Base):
     __tablename__ = "analyses"
-    
+    # /history filters by user_id and orders by created_at DESC; the
+    # composite index serves both without a sort pass
+    __table_args__ = (
+        Index("ix_analysis_user_created", "user_id", "created_at"),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, nullable=False, index=True)
+    content_hash = Column(String, index=True)  # blake2b of PDF bytes + JD text
     resume_preview = Column(Text)
     jd_used = Column(String)
     ats_score = Column(Integer)
     gemini_suggestions = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
-    
+
     def __repr__(self):
         return f"<Analysis(id={self.id}, user_id={self.user_id}, ats_score={self.ats_score})>"
 
-# Create all tables
-Base.metadata.create_all(bind=engine)
-
-def get_db():
+async def get_db():
     """Dependency for database sessions"""
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+def _migrate_schema(conn):
+    """
+    Bring pre-existing databases up to the current schema. create_all
+    skips tables that already exist, so columns added later need
+    explicit DDL; guarded by PRAGMA table_info so it is idempotent.
+    """
+    cols = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(analyses)")}
+    if cols and "content_hash" not in cols:
+        conn.exec_driver_sql("ALTER TABLE analyses ADD COLUMN content_hash VARCHAR")
+        conn.exec_driver_sql(
+            "CREATE INDEX IF NOT EXISTS ix_analyses_content_hash "
+            "ON analyses (content_hash)"
+        )
+    if cols:
+        # create_all only builds indexes together with their table, so
+        # the /history composite index never appears on old databases
+        # without this
+        conn.exec_driver_sql(
+            "CREATE INDEX IF NOT EXISTS ix_analysis_user_created "
+            "ON analyses (user_id, created_at)"
+        )
 
 # Initialize database function
-def init_db():
+async def init_db():
     """Initialize database with tables"""
     try:
-        Base.metadata.create_all(bind=engine)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(_migrate_schema)
         print("✅ Database initialized successfully")
     except Exception as e:
         print(f"❌ Database initialization failed: {e}")
 
 if __name__ == "__main__":
-    init_db()
\ No newline at end of file
+    asyncio.run(init_db())
@@ -0,0 +1,25 @@
+import logging
+from functools import lru_cache
+
+import torch
+from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBEDDER = "all-MiniLM-L6-v2"
+
+
+@lru_cache(maxsize=1)
+def get_embedder(model_name: str = DEFAULT_EMBEDDER) -> SentenceTransformer:
+    """Load the shared sentence-transformer once per process.
+
+    Every caller gets the same instance, so the ~90MB of weights and the
+    tokenizer warm-up are paid a single time no matter how many scorers
+    are constructed. Uses GPU + FP16 when available.
+    """
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    embedder = SentenceTransformer(model_name, device=device)
+    if device == "cuda":
+        embedder.half()
+    logger.info(f"Loaded embedding model: {model_name} on {device}")
+    return embedder
@@ -1,5 +1,9 @@
+import asyncio
+import hashlib
 import os
 import google.generativeai as genai
+from cachetools import TTLCache
+from fastapi.concurrency import run_in_threadpool
 from config import settings
 
 # Configure Gemini API - let SDK handle endpoint resolution automatically
@@ -9,24 +13,69 @@ genai.configure(api_key=settings.GEMINI_API_KEY)
 # Try without -latest suffix first, as SDK may handle versioning automatically
 DEFAULT_MODEL = os.getenv("GEMINI_MODEL_NAME", "gemini-1.5-flash")
 
+# Single shared model handle - constructing one per call is wasted work
+_MODEL = genai.GenerativeModel(DEFAULT_MODEL)
+
+# How much resume/JD text fits in a prompt; callers truncate to this once
+PROMPT_CHARS = 2000
+
+# Served in place of Gemini calls when scoring signals the resume/JD pair is
+# too weak for tailored advice to help yet - saves the multi-second round-trip
+LOW_SCORE_SUGGESTIONS = """Your ATS score is very low, so fix the fundamentals before fine-tuning:
+
+1. **Structure** - Use standard section headers (Summary, Experience, Education, Skills)
+2. **Keywords** - Mirror the key skills and terminology from the job description
+3. **Formatting** - Use bullet points starting with strong action verbs
+4. **Evidence** - Quantify achievements with numbers wherever possible
+5. **Basics** - Include contact details and dates for every role
+
+Re-run the analysis after these changes for detailed AI suggestions."""
+
+LOW_SCORE_IMPROVEMENT_POINTS = [
+    "Add standard section headers so ATS systems can parse your resume",
+    "Incorporate the key skills and keywords from the job description",
+    "Rewrite experience as bullet points led by strong action verbs",
+    "Quantify achievements with concrete numbers and outcomes",
+    "Include complete contact information and dates for each role",
+]
+
+# Responses cached by input hash: users iterate on the same resume+JD pair,
+# and each duplicate Gemini call is multi-second and costs quota.
+_response_cache = TTLCache(maxsize=512, ttl=3600)
+
+
+def _text_key(text: str) -> bytes:
+    # Normalize whitespace and case before hashing so re-uploads that only
+    # differ in formatting (the common iteration noise) still hit the cache
+    normalized = " ".join(text.split()).lower()
+    return hashlib.blake2b(normalized.encode(), digest_size=16).digest()
+
 
 def get_gemini_suggestions(resume_text: str, jd_text: str, ats_score: float) -> dict:
     """
-    Get AI-powered suggestions from Gemini API
+    Get AI-powered suggestions from Gemini API.
+
+    Callers should pass text already truncated to the prompt window
+    (PROMPT_CHARS) so the large original strings stay out of this path.
     """
+    cache_key = ("suggestions", _text_key(resume_text), _text_key(jd_text), round(ats_score, 1))
+    cached = _response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     try:
-        model = genai.GenerativeModel(DEFAULT_MODEL)
-        
+        model = _MODEL
+
         prompt = f"""
 You are an expert ATS (Applicant Tracking System) consultant and career coach. 
 
 Analyze this resume against the job description and provide actionable improvement suggestions.
 
 **Resume Text:**
-{resume_text[:2000]}
+{resume_text}
 
 **Job Description:**
-{jd_text[:2000]}
+{jd_text}
 
 **Current ATS Score:** {ats_score}%
 
@@ -44,13 +93,16 @@ Keep suggestions practical, specific, and directly tied to improving the ATS sco
         import time
         start_time = time.time()
         response = model.generate_content(prompt)
-        
-        return {
+
+        result = {
             "success": True,
             "suggestions": response.text,
             "error": None
         }
-    
+        # Only memoize successes so transient failures get retried
+        _response_cache[cache_key] = result
+        return result
+
     except Exception as e:
         error_msg = str(e)
         # Provide user-friendly error messages
@@ -76,25 +128,50 @@ def get_resume_improvement_points(resume_text: str) -> list:
     """
     Get specific improvement points for resume enhancement
     """
+    cache_key = ("improvements", _text_key(resume_text))
+    cached = _response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     try:
-        model = genai.GenerativeModel(DEFAULT_MODEL)
-        
+        model = _MODEL
+
         prompt = f"""
 Analyze this resume and provide exactly 5 specific improvement points.
 Each point should be actionable and start with a strong verb.
 
 Resume:
-{resume_text[:2000]}
+{resume_text}
 
 Format: Return only a numbered list (1-5) with concise points.
 """
         
         response = model.generate_content(prompt)
         points = response.text.strip().split('\n')
-        return [p.strip() for p in points if p.strip()][:5]
+        points = [p.strip() for p in points if p.strip()][:5]
+        _response_cache[cache_key] = points
+        return points
     
     except Exception as e:
         return [
             "Unable to generate suggestions at this time",
             f"Error: {str(e)}"
-        ]
\ No newline at end of file
+        ]
+
+
+# Bounds in-flight Gemini calls across all requests: under load, queueing
+# here is cheaper than burning API quota on calls destined to 429
+_MAX_CONCURRENT_CALLS = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+_call_semaphore = asyncio.Semaphore(_MAX_CONCURRENT_CALLS)
+
+
+async def get_gemini_suggestions_async(resume_text: str, jd_text: str, ats_score: float) -> dict:
+    """Threadpool wrapper so the blocking SDK call doesn't stall the event loop."""
+    async with _call_semaphore:
+        return await run_in_threadpool(get_gemini_suggestions, resume_text, jd_text, ats_score)
+
+
+async def get_resume_improvement_points_async(resume_text: str) -> list:
+    """Threadpool wrapper so the blocking SDK call doesn't stall the event loop."""
+    async with _call_semaphore:
+        return await run_in_threadpool(get_resume_improvement_points, resume_text)
\ No newline at end of file
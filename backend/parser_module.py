@@ -1,9 +1,22 @@
 
 import io
+import fitz  # PyMuPDF
 from pdfminer.high_level import extract_text_to_fp
 from pdfminer.layout import LAParams
 
 def extract_text_from_pdfbytes(file_bytes: bytes) -> str:
+    # PyMuPDF parses in C++ and is 10-50x faster than pdfminer on typical
+    # resumes; pdfminer stays as the fallback for PDFs fitz can't open.
+    try:
+        doc = fitz.open(stream=file_bytes, filetype="pdf")
+        try:
+            text = "\n".join(page.get_text("text") for page in doc)
+        finally:
+            doc.close()
+        if text and len(text.strip()) > 10:
+            return text
+    except Exception:
+        pass
     out = io.StringIO()
     try:
         extract_text_to_fp(io.BytesIO(file_bytes), out, laparams=LAParams(), output_type='text', codec=None)
@@ -7,13 +7,36 @@ HERE = os.path.dirname(__file__)
 MODEL_PATH = os.path.join(HERE, "models", "xgb_calibrated.joblib")
 SCALER_PATH = os.path.join(HERE, "models", "feature_scaler.joblib")
 
+
+@lru_cache(maxsize=1)
+def _load_models():
+    """Deserialize the model and scaler once per process.
+
+    Returns (clf, scaler) or None when the artifacts are missing, so
+    callers fall back to heuristic scoring without re-statting the disk.
+    """
+    if os.path.exists(MODEL_PATH) and os.path.exists(SCALER_PATH):
+        return joblib.load(MODEL_PATH), joblib.load(SCALER_PATH)
+    return None
+
+@lru_cache(maxsize=1024)
 def _skills_set(skills: str):
-    return set(s.strip().lower() for s in str(skills).split(",") if s.strip())
+    # Memoized: batch scoring reuses the same skills strings for every
+    # resume, so repeated parses collapse to one dict hit. Frozen so the
+    # shared result cannot be mutated by callers.
+    return frozenset(s.strip().lower() for s in str(skills).split(",") if s.strip())
 
 def compute_features_array(resume_text, jd_text, skills_resume, skills_jd, years_resume, years_jd):
-    # Simple feature extraction without ML dependencies
-    resume_len = len(str(resume_text))
-    jd_len = len(str(jd_text))
+    # Simple feature extraction without ML dependencies. Normalize each
+    # input once up front; the old code re-ran str()/lower() per feature,
+    # copying large resumes several times.
+    resume_str = str(resume_text)
+    jd_str = str(jd_text)
+    resume_lower = resume_str.lower()
+    jd_lower = jd_str.lower()
+
+    resume_len = len(resume_str)
+    jd_len = len(jd_str)
     
     sr = _skills_set(skills_resume)
     sj = _skills_set(skills_jd)
@@ -22,15 +45,14 @@ def compute_features_array(resume_text, jd_text, skills_resume, skills_jd, years
     
     years_diff = abs(float(years_resume) - float(years_jd))
     
-    bullets = str(resume_text).count("\n-") + str(resume_text).count("\n•")
-    headers = sum([1 for h in ["summary", "experience", "education", "skills", "projects", "achievements"] 
-                   if h in str(resume_text).lower()])
+    bullets = resume_str.count("\n-") + resume_str.count("\n•")
+    headers = sum(1 for h in ("summary", "experience", "education", "skills", "projects", "achievements")
+                  if h in resume_lower)
     
     # Simple similarity score based on common words
-    resume_words = set(str(resume_text).lower().split())
-    jd_words = set(str(jd_text).lower().split())
-    common_words = resume_words & jd_words
-    similarity = len(common_words) / max(len(jd_words), 1)
+    jd_words = set(jd_lower.split())
+    common = jd_words.intersection(resume_lower.split())
+    similarity = len(common) / max(len(jd_words), 1)
     
     return np.array([similarity, overlap, coverage, years_diff, resume_len, jd_len, bullets, headers]).reshape(1, -1), {
         "sim": similarity,
@@ -64,17 +86,78 @@ def final_score_composition(prob, meta):
     final = max(0.0, min(100.0, final))
     return round(final, 2)
 
+def final_score_batch(prob, coverage, bullets, headers, years_diff):
+    """Vectorized final_score_composition over whole batches.
+
+    Same arithmetic as the scalar version, expressed with np.minimum/
+    np.clip so N resumes compose in one call; the years penalty uses
+    max(0, .) in place of the scalar if, which is equivalent.
+    """
+    base = np.asarray(prob, dtype=np.float64) * 100.0
+    kw_pts = np.minimum(15.0, 0.15 * np.asarray(coverage, dtype=np.float64) * 100.0)
+    fmt = np.asarray(bullets, dtype=np.float64) * 0.7 + np.asarray(headers, dtype=np.float64) * 1.0
+    fmt_pts = np.minimum(8.0, fmt)
+    penalty = np.minimum(10.0, np.maximum(0.0, (np.asarray(years_diff, dtype=np.float64) - 4.0) * 2.0))
+    return np.round(np.clip(base + kw_pts + fmt_pts - penalty, 0.0, 100.0), 2)
+
+def score_resume_batch(resumes, jd_text, skills_resume="", skills_jd="", years_resume=0, years_jd=0):
+    """
+    Score many resumes against one job description.
+
+    Features are extracted per resume but the scaler transform, the model
+    predict_proba, and the final score composition each run once over the
+    whole batch instead of once per resume.
+    """
+    if not resumes:
+        return []
+
+    rows = [compute_features_array(r, jd_text, skills_resume, skills_jd, years_resume, years_jd)
+            for r in resumes]
+    feats = np.vstack([f for f, _ in rows])
+    metas = [m for _, m in rows]
+
+    try:
+        loaded = _load_models()
+        if loaded is not None:
+            clf, scaler = loaded
+            probs = clf.predict_proba(scaler.transform(feats))[:, 1]
+            scores = final_score_batch(
+                probs,
+                [m["coverage"] for m in metas],
+                [m["bullets"] for m in metas],
+                [m["headers"] for m in metas],
+                [m["years_diff"] for m in metas],
+            )
+            return [
+                {"probability": round(float(p), 4), "score": float(sc), "meta": m}
+                for p, sc, m in zip(probs, scores, metas)
+            ]
+    except Exception as e:
+        print(f"ML model not available, using fallback scoring: {e}")
+
+    # Fallback scoring without ML, same formula as score_resume
+    base = np.array([m["sim"] for m in metas]) * 50
+    coverage = np.array([m["coverage"] for m in metas]) * 30
+    fmt = np.minimum(20, np.array([m["bullets"] for m in metas]) * 2
+                     + np.array([m["headers"] for m in metas]) * 3)
+    penalty = np.minimum(10, np.array([m["years_diff"] for m in metas]) * 2)
+    finals = np.clip(base + coverage + fmt - penalty, 0, 100)
+    return [
+        {"probability": round(float(f) / 100, 4), "score": round(float(f), 2), "meta": m}
+        for f, m in zip(finals, metas)
+    ]
+
 def score_resume(resume_text, jd_text, skills_resume="", skills_jd="", years_resume=0, years_jd=0):
     """
     Calculate ATS score without ML model (fallback scoring)
     If model files exist, they will be loaded and used
     """
     try:
-        # Try to load ML model if it exists
-        if os.path.exists(MODEL_PATH) and os.path.exists(SCALER_PATH):
-            clf = joblib.load(MODEL_PATH)
-            scaler = joblib.load(SCALER_PATH)
-            
+        # Use the ML model if its artifacts exist (loaded once per process)
+        loaded = _load_models()
+        if loaded is not None:
+            clf, scaler = loaded
+
             feats, meta = compute_features_array(
                 resume_text, jd_text, skills_resume, skills_jd, years_resume, years_jd
             )
@@ -1,8 +1,12 @@
+import hashlib
 import os
+import re
+import time
+
 import pandas as pd
 import numpy as np
 import joblib
-from tqdm import tqdm
+from joblib import Parallel, delayed
 from typing import List, Optional
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
@@ -11,12 +15,22 @@ from sklearn.metrics import (
     r2_score, accuracy_score, classification_report
 )
 from xgboost import XGBRegressor, XGBClassifier
-from sentence_transformers import SentenceTransformer, util
+import torch
+from embedding_cache import get_embedder
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Contact-info patterns compiled once; used per row in extract_features
+# and per column in extract_features_batch
+# Embeddings persisted across runs, content-addressed by text hash;
+# hyperparameter iteration reruns skip re-encoding the whole corpus
+_EMB_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "emb_cache")
+
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_PHONE_RE = re.compile(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b')
+
 
 class ResumeFeatureEngineer:
     """
@@ -25,8 +39,34 @@ class ResumeFeatureEngineer:
     """
     
     def __init__(self, embedder_name: str = "all-MiniLM-L6-v2"):
-        self.embedder = SentenceTransformer(embedder_name)
-        logger.info(f"Loaded embedding model: {embedder_name}")
+        # Shared per-process instance (same one the serving scorer uses),
+        # so constructing several engineers loads the weights once
+        self.embedder = get_embedder(embedder_name)
+
+        # On CPU, int8 dynamic quantization of the linear layers roughly
+        # doubles encode throughput (int8 dot products vs FP32 FMA) with
+        # negligible effect on MiniLM similarity features
+        if not torch.cuda.is_available():
+            try:
+                self.embedder[0].auto_model = torch.quantization.quantize_dynamic(
+                    self.embedder[0].auto_model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+                logger.info("Applied int8 dynamic quantization to embedder")
+            except Exception as e:
+                logger.warning(f"Embedder quantization skipped: {e}")
+
+        # On-disk embedding cache: merge every shard written by earlier
+        # runs (and by parallel workers) into one in-memory dict
+        self._emb_cache = {}
+        self._new_emb_keys = set()
+        if os.path.isdir(_EMB_CACHE_DIR):
+            for fname in sorted(os.listdir(_EMB_CACHE_DIR)):
+                if fname.endswith(".npz"):
+                    with np.load(os.path.join(_EMB_CACHE_DIR, fname)) as data:
+                        for key in data.files:
+                            self._emb_cache[key] = data[key]
+            if self._emb_cache:
+                logger.info(f"Loaded {len(self._emb_cache)} cached embeddings")
     
     def extract_features(
         self,
@@ -43,17 +83,191 @@ class ResumeFeatureEngineer:
         Returns:
             1D numpy array of features
         """
+        # One fused forward for both texts; normalized embeddings make
+        # cosine a dot product
+        embs = self.embedder.encode(
+            [str(resume_text), str(jd_text)],
+            batch_size=2,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+        semantic_sim = float(embs[0] @ embs[1])
+
+        features = [semantic_sim] + self._nonsemantic_features(
+            resume_text, jd_text, skills_resume, skills_jd, years_resume, years_jd
+        )
+        return np.array(features).reshape(1, -1)
+
+    def extract_features_batch(
+        self, df: pd.DataFrame, batch_size: int = 256, show_progress_bar: bool = True
+    ) -> np.ndarray:
+        """
+        Extract features for a whole dataframe at once.
+
+        The resume and JD columns are embedded in two bulk encode calls
+        instead of two model invocations per row, so 50k rows cost two
+        padded batch forwards rather than 100k sequential ones.
+
+        Returns:
+            2D numpy array, one feature row per dataframe row
+        """
+        n = len(df)
+
+        def _text_col(name):
+            return df[name].astype(str).tolist() if name in df.columns else [""] * n
+
+        def _num_col(name):
+            if name in df.columns:
+                return pd.to_numeric(df[name], errors='coerce').fillna(0.0).tolist()
+            return [0.0] * n
+
+        resume_texts = _text_col('resume_text')
+        jd_texts = _text_col('jd_text')
+
+        resume_embs = self._encode_cached(resume_texts, batch_size, show_progress_bar)
+        jd_embs = self._encode_cached(jd_texts, batch_size, show_progress_bar)
+        sims = (resume_embs * jd_embs).sum(axis=1)
+
+        # Non-semantic features as whole-column expressions: pandas str
+        # ops run C loops, and the set-based features stream through
+        # np.fromiter instead of building per-row Python lists. Columns
+        # are float32 throughout: XGBoost hist and StandardScaler both
+        # take it, and the matrix halves its cache footprint
+        resume_s = pd.Series(resume_texts)
+        jd_s = pd.Series(jd_texts)
+        resume_lower = resume_s.str.lower()
+        jd_lower = jd_s.str.lower()
+
+        resume_tokens = resume_lower.str.split()
+        jd_tokens = jd_lower.str.split()
+        jd_token_sets = [set(t) for t in jd_tokens]
+        keyword_overlap = np.fromiter(
+            (len(set(a) & b) / max(len(b), 1) for a, b in zip(resume_tokens, jd_token_sets)),
+            dtype=np.float32, count=n,
+        )
+
+        sr_sets = [
+            frozenset(x.strip() for x in t.lower().split(',') if x.strip())
+            for t in _text_col('skills_resume')
+        ]
+        sj_sets = [
+            frozenset(x.strip() for x in t.lower().split(',') if x.strip())
+            for t in _text_col('skills_jd')
+        ]
+        skills_match = np.fromiter(
+            (len(a & b) / len(b) if b else 0.5 for a, b in zip(sr_sets, sj_sets)),
+            dtype=np.float32, count=n,
+        )
+        num_matching = np.fromiter(
+            (len(a & b) for a, b in zip(sr_sets, sj_sets)), dtype=np.float32, count=n
+        )
+        total_resume_skills = np.fromiter(
+            (len(a) for a in sr_sets), dtype=np.float32, count=n
+        )
+
+        yr = np.asarray(_num_col('years_exp_resume'), dtype=np.float32)
+        yj = np.asarray(_num_col('years_exp_jd'), dtype=np.float32)
+        exp_match = np.where(
+            yj > 0,
+            np.minimum(np.divide(yr, yj, out=np.ones_like(yr), where=yj > 0), 2.0),
+            1.0,
+        )
+
+        resume_word_count = resume_tokens.str.len().to_numpy(dtype=np.float32)
+        jd_word_count = jd_tokens.str.len().to_numpy(dtype=np.float32)
+        avg_word_length = np.fromiter(
+            (sum(map(len, ws)) / len(ws) if ws else 0.0 for ws in resume_tokens),
+            dtype=np.float32, count=n,
+        )
+
+        important_words = ['required', 'must', 'experience', 'skills', 'qualifications']
+        density_counts = sum(jd_lower.str.count(w) for w in important_words)
+        keyword_density = density_counts.to_numpy(dtype=np.float32) / np.maximum(jd_word_count, 1)
+
+        columns = [
+            sims,
+            keyword_overlap,
+            skills_match,
+            num_matching,
+            total_resume_skills,
+            exp_match,
+            np.abs(yr - yj),
+            resume_s.str.len().to_numpy(dtype=np.float32),
+            resume_word_count,
+            resume_s.str.count('\n').to_numpy(dtype=np.float32) + 1,
+            jd_s.str.len().to_numpy(dtype=np.float32),
+            jd_word_count,
+            (resume_s.str.count('\u2022') + resume_s.str.count('-')).to_numpy(dtype=np.float32),
+            resume_s.str.count('\n\n').to_numpy(dtype=np.float32),
+        ]
+        for section in ['experience', 'education', 'skills', 'summary', 'projects']:
+            columns.append(
+                resume_lower.str.contains(section, regex=False).to_numpy(dtype=np.float32)
+            )
+        columns.append(resume_s.str.contains(_EMAIL_RE).to_numpy(dtype=np.float32))
+        columns.append(resume_s.str.contains(_PHONE_RE).to_numpy(dtype=np.float32))
+        columns.append(avg_word_length)
+        columns.append(keyword_density)
+
+        return np.column_stack(columns)
+
+    def _encode_cached(
+        self, texts: list, batch_size: int, show_progress_bar: bool
+    ) -> np.ndarray:
+        """Encode texts, reusing on-disk embeddings; only misses hit the model."""
+        keys = [
+            hashlib.blake2b(t.encode(), digest_size=16).hexdigest() for t in texts
+        ]
+        misses = [i for i, k in enumerate(keys) if k not in self._emb_cache]
+        if misses:
+            encoded = self.embedder.encode(
+                [texts[i] for i in misses],
+                batch_size=batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=show_progress_bar,
+            )
+            for i, emb in zip(misses, encoded):
+                self._emb_cache[keys[i]] = emb
+                self._new_emb_keys.add(keys[i])
+        return np.vstack([self._emb_cache[k] for k in keys])
+
+    def save_embedding_cache(self) -> None:
+        """Persist embeddings encoded this run so reruns skip them."""
+        if not self._new_emb_keys:
+            return
+        os.makedirs(_EMB_CACHE_DIR, exist_ok=True)
+        path = os.path.join(
+            _EMB_CACHE_DIR, f"emb_{os.getpid()}_{int(time.time())}.npz"
+        )
+        np.savez(path, **{k: self._emb_cache[k] for k in self._new_emb_keys})
+        logger.info(f"Saved {len(self._new_emb_keys)} new embeddings to {path}")
+        self._new_emb_keys.clear()
+
+    def _nonsemantic_features(
+        self,
+        resume_text: str,
+        jd_text: str,
+        skills_resume: str,
+        skills_jd: str,
+        years_resume: float,
+        years_jd: float
+    ) -> list:
+        """Everything except the semantic similarity, as a plain list."""
+        # Normalize and tokenize each document once; every feature below
+        # reads these instead of re-walking multi-KB strings
+        resume_str = str(resume_text)
+        jd_str = str(jd_text)
+        resume_lower = resume_str.lower()
+        jd_lower = jd_str.lower()
+        resume_tokens = resume_str.split()
+        jd_word_count = len(jd_lower.split())
+
         features = []
-        
-        # 1. Semantic Similarity (using sentence transformers)
-        emb_resume = self.embedder.encode(str(resume_text), convert_to_tensor=True)
-        emb_jd = self.embedder.encode(str(jd_text), convert_to_tensor=True)
-        semantic_sim = float(util.cos_sim(emb_resume, emb_jd).cpu().numpy().squeeze())
-        features.append(semantic_sim)
-        
+
         # 2. Keyword Overlap
-        resume_words = set(str(resume_text).lower().split())
-        jd_words = set(str(jd_text).lower().split())
+        resume_words = set(resume_lower.split())
+        jd_words = set(jd_lower.split())
         keyword_overlap = len(resume_words & jd_words) / max(len(jd_words), 1)
         features.append(keyword_overlap)
         
@@ -83,46 +297,42 @@ class ResumeFeatureEngineer:
         features.append(abs(years_resume - years_jd))
         
         # 8. Resume Length Features
-        features.append(len(str(resume_text)))  # Character count
-        features.append(len(str(resume_text).split()))  # Word count
-        features.append(len(str(resume_text).split('\n')))  # Line count
+        features.append(len(resume_str))  # Character count
+        features.append(len(resume_tokens))  # Word count
+        features.append(resume_str.count('\n') + 1)  # Line count
         
         # 9. JD Length Features
-        features.append(len(str(jd_text)))
-        features.append(len(str(jd_text).split()))
+        features.append(len(jd_str))
+        features.append(jd_word_count)
         
         # 10. Formatting Quality Indicators
-        features.append(str(resume_text).count('•') + str(resume_text).count('-'))  # Bullet points
-        features.append(str(resume_text).count('\n\n'))  # Paragraph breaks
+        features.append(resume_str.count('•') + resume_str.count('-'))  # Bullet points
+        features.append(resume_str.count('\n\n'))  # Paragraph breaks
         
         # 11. Section Detection (binary indicators)
-        resume_lower = str(resume_text).lower()
         sections = ['experience', 'education', 'skills', 'summary', 'projects']
         for section in sections:
             features.append(1.0 if section in resume_lower else 0.0)
         
         # 12. Contact Info Present
-        import re
-        has_email = 1.0 if re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', str(resume_text)) else 0.0
-        has_phone = 1.0 if re.search(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', str(resume_text)) else 0.0
+        has_email = 1.0 if _EMAIL_RE.search(resume_str) else 0.0
+        has_phone = 1.0 if _PHONE_RE.search(resume_str) else 0.0
         features.append(has_email)
         features.append(has_phone)
         
         # 13. Readability Score (simple version)
-        words = str(resume_text).split()
-        if words:
-            avg_word_length = np.mean([len(w) for w in words])
+        if resume_tokens:
+            avg_word_length = sum(map(len, resume_tokens)) / len(resume_tokens)
             features.append(avg_word_length)
         else:
             features.append(0.0)
         
         # 14. JD Keyword Density
         important_words = ['required', 'must', 'experience', 'skills', 'qualifications']
-        jd_lower = str(jd_text).lower()
-        keyword_density = sum(jd_lower.count(w) for w in important_words) / max(len(jd_lower.split()), 1)
+        keyword_density = sum(jd_lower.count(w) for w in important_words) / max(jd_word_count, 1)
         features.append(keyword_density)
         
-        return np.array(features).reshape(1, -1)
+        return features
     
     def get_feature_names(self) -> list:
         """Return feature names for interpretability."""
@@ -153,6 +363,22 @@ class ResumeFeatureEngineer:
         ]
 
 
+# One engineer per worker process, created lazily on first chunk so the
+# model loads once per core rather than once per chunk
+_worker_engineer = None
+
+
+def _featurize_chunk(chunk: pd.DataFrame) -> np.ndarray:
+    global _worker_engineer
+    if _worker_engineer is None:
+        _worker_engineer = ResumeFeatureEngineer()
+    features = _worker_engineer.extract_features_batch(chunk, show_progress_bar=False)
+    # Each worker writes its own cache shard; the per-pid-and-timestamp
+    # filenames keep concurrent writers from clobbering each other
+    _worker_engineer.save_embedding_cache()
+    return features
+
+
 def load_and_prepare_data(csv_path: str, task: str = 'regression') -> tuple:
     """
     Load CSV and prepare features and labels.
@@ -166,7 +392,27 @@ def load_and_prepare_data(csv_path: str, task: str = 'regression') -> tuple:
         X, y, feature_names
     """
     logger.info(f"Loading data from {csv_path}")
-    df = pd.read_csv(csv_path)
+
+    # Columnar cache: the first run converts the CSV to parquet next to
+    # it, and later runs load that instead of re-parsing 50k long text
+    # rows; the pyarrow CSV engine speeds up the cold parse too
+    parquet_path = os.path.splitext(csv_path)[0] + ".parquet"
+    if (
+        os.path.exists(parquet_path)
+        and os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path)
+    ):
+        logger.info(f"Using parquet cache: {parquet_path}")
+        df = pd.read_parquet(parquet_path)
+    else:
+        try:
+            df = pd.read_csv(csv_path, engine='pyarrow')
+        except Exception:
+            df = pd.read_csv(csv_path)
+        try:
+            df.to_parquet(parquet_path)
+            logger.info(f"Cached dataset as parquet: {parquet_path}")
+        except Exception as e:
+            logger.warning(f"Could not write parquet cache: {e}")
     
     logger.info(f"Loaded {len(df)} rows")
     logger.info(f"Columns: {df.columns.tolist()}")
@@ -174,49 +420,52 @@ def load_and_prepare_data(csv_path: str, task: str = 'regression') -> tuple:
     # Initialize feature engineer
     engineer = ResumeFeatureEngineer()
     
-    # Extract features for each row
-    feature_list = []
-    labels = []
-    
-    logger.info("Extracting features...")
-    for idx, row in tqdm(df.iterrows(), total=len(df)):
-        try:
-            features = engineer.extract_features(
-                resume_text=str(row.get('resume_text', '')),
-                jd_text=str(row.get('jd_text', '')),
-                skills_resume=str(row.get('skills_resume', '')),
-                skills_jd=str(row.get('skills_jd', '')),
-                years_resume=float(row.get('years_exp_resume', 0)),
-                years_jd=float(row.get('years_exp_jd', 0))
-            )
-            
-            feature_list.append(features.flatten())
-            
-            # Get label
-            label = row.get('label', row.get('score', 0))
-            
-            if task == 'classification':
-                # Convert to binary (assuming label is 0-100 or 0-1)
-                if label > 1:  # Assume 0-100 scale
-                    label = 1 if label >= 60 else 0
-                else:  # Already binary
-                    label = int(label)
-            else:  # regression
-                if label <= 1:  # Convert 0-1 to 0-100
-                    label = label * 100
-                label = float(label)
-            
-            labels.append(label)
-            
-        except Exception as e:
-            logger.error(f"Error processing row {idx}: {e}")
-            continue
+    # Resolve labels first so rows with bad labels are dropped before the
+    # (expensive) feature pass. Whole-column conversion replaces the old
+    # iterrows loop, which boxed every value into a per-row Series;
+    # non-numeric labels coerce to NaN and are dropped, matching the old
+    # skip-on-error behavior.
+    if 'label' in df.columns:
+        raw_labels = df['label']
+    elif 'score' in df.columns:
+        raw_labels = df['score']
+    else:
+        raw_labels = pd.Series(0, index=df.index)
     
-    if not feature_list:
+    numeric = pd.to_numeric(raw_labels, errors='coerce')
+    valid = numeric.notna()
+    if not valid.any():
         raise ValueError("No valid rows were processed from the dataset.")
+    if not valid.all():
+        logger.error(f"Dropping {int((~valid).sum())} rows with invalid labels")
+        df = df.loc[valid]
+        numeric = numeric[valid]
     
-    X = np.vstack(feature_list)
-    y = np.array(labels)
+    values = numeric.to_numpy()
+    if task == 'classification':
+        # Convert to binary (0-100 scale maps at the 60 threshold;
+        # 0/1 labels pass through)
+        labels = np.where(values > 1, (values >= 60).astype(int), values.astype(int))
+    else:  # regression
+        # Convert 0-1 labels to 0-100
+        labels = np.where(values <= 1, values * 100, values).astype(float)
+    
+    # Features for all rows. Large corpora are sharded across cores so
+    # every worker encodes its own chunk (loky caps each worker's BLAS/
+    # OpenMP threads, so the forwards don't oversubscribe); small inputs
+    # stay in-process to avoid paying a model load per worker.
+    logger.info("Extracting features...")
+    n_workers = os.cpu_count() or 1
+    if n_workers > 1 and len(df) >= 5000:
+        chunks = np.array_split(df, n_workers)
+        parts = Parallel(n_jobs=n_workers, prefer='processes')(
+            delayed(_featurize_chunk)(chunk) for chunk in chunks
+        )
+        X = np.vstack(parts)
+    else:
+        X = engineer.extract_features_batch(df)
+        engineer.save_embedding_cache()
+    y = np.asarray(labels)
     
     logger.info(f"Features shape: {X.shape}")
     logger.info(f"Labels shape: {y.shape}")
@@ -235,13 +484,17 @@ def train_model(
     """
     Train XGBoost model with proper validation.
     """
-    # Scale features
+    # Scale features. copy=False standardizes the float32 matrices in
+    # place instead of allocating scaled duplicates.
     logger.info("Scaling features...")
-    scaler = StandardScaler()
+    scaler = StandardScaler(copy=False)
     X_train_scaled = scaler.fit_transform(X_train)
     X_test_scaled = scaler.transform(X_test)
     
-    # Train model
+    # Train model. The histogram tree method bins features once instead
+    # of scanning exact splits (order-of-magnitude faster on wide data),
+    # and the GPU runs it when torch sees one.
+    device = 'cuda' if torch.cuda.is_available() else 'cpu'
     if task == 'classification':
         logger.info("Training XGBoost Classifier...")
         model = XGBClassifier(
@@ -251,7 +504,10 @@ def train_model(
             subsample=0.8,
             colsample_bytree=0.8,
             random_state=42,
-            eval_metric='logloss'
+            eval_metric='logloss',
+            tree_method='hist',
+            device=device,
+            n_jobs=-1
         )
     else:  # regression
         logger.info("Training XGBoost Regressor...")
@@ -262,7 +518,10 @@ def train_model(
             subsample=0.8,
             colsample_bytree=0.8,
             random_state=42,
-            eval_metric='rmse'
+            eval_metric='rmse',
+            tree_method='hist',
+            device=device,
+            n_jobs=-1
         )
     
     # Fit model